@@ -18,7 +18,7 @@ WRITE_TODOS_DESCRIPTION = """Create and manage structured task lists for trackin
 - Use clear, actionable content descriptions
 - Status must be: pending, in_progress, or completed
 
-## Best Practices  
+## Best Practices
 - Only one in_progress task at a time
 - Mark completed immediately when task is fully done
 - Always send the full updated list when making changes
@@ -26,7 +26,7 @@ WRITE_TODOS_DESCRIPTION = """Create and manage structured task lists for trackin
 
 ## Progress Updates
 - Call TodoWrite again to change task status or edit content
-- Reflect real-time progress; don't batch completions  
+- Reflect real-time progress; don't batch completions
 - If blocked, keep in_progress and add new task describing blocker
 
 ## Parameters
@@ -50,7 +50,7 @@ TODO_USAGE_INSTRUCTIONS = """**TODO List Usage Guidelines:**
 
 **SPECIFIC Examples that REQUIRE TODOs:**
 - "Find X, then create Y based on what you found"
-- "Create multiple issues/PRs for different items" 
+- "Create multiple issues/PRs for different items"
 - "Look for discussion, extract tasks, create issues for each task"
 - "Search repository, analyze code, and create documentation"
 - "Review issues, categorize them, then create summary report"
@@ -83,7 +83,7 @@ This tool returns file content with line numbers (like `cat -n`) and supports re
 
 Parameters:
 - file_path (required): Path to the file you want to read
-- offset (optional, default=0): Line number to start reading from  
+- offset (optional, default=0): Line number to start reading from
 - limit (optional, default=2000): Maximum number of lines to read
 
 Essential before making any edits to understand existing content. Always read a file before editing it."""
@@ -115,7 +115,7 @@ SUMMARIZE_WEB_SEARCH = """You are creating a minimal summary for research steeri
 
 Create a VERY CONCISE summary focusing on:
 1. Main topic/subject in 1-2 sentences
-2. Key information type (facts, tutorial, news, analysis, etc.)  
+2. Key information type (facts, tutorial, news, analysis, etc.)
 3. Most significant 1-2 findings or points
 
 Keep the summary under 150 words total. The agent needs to know what's in this file to decide if it should search for more information or use this source.
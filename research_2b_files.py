@@ -2,20 +2,28 @@
 """MCP server that demonstrates durable resource links for price tracking."""
 
 import asyncio
-import json
+import logging
 import os
 import random
 import re
+import time
 import uuid
 import urllib.parse
+from urllib.request import url2pathname
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-import anyio
+import orjson
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Resource, ResourceLink, TextContent, TextResourceContents, Tool
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows; fall back to asyncio's loop
+    uvloop = None
+
 try:  
     from pydantic import AnyUrl  
 except Exception:  
@@ -31,25 +39,40 @@ else:
 STORE_DIR = Path(os.getenv("DURABILITY_STORE", Path(__file__).parent / "flight_watch_store"))
 STORE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Log to stderr; stdout carries the MCP JSON-RPC stream.
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 # DeepAgents instances call into this server to persist snapshots produced by their agents.
 server = Server("durable-flight-watch")
 
+# Price quotes are coalesced into a single notification once either limit is hit.
+NOTIFY_BATCH_SIZE = 4
+NOTIFY_MAX_DELAY = 3.0
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+# Only the most recent quotes are kept so each tick's rewrite stays a bounded size.
+HISTORY_WINDOW = 256
+
+# Attempts (and the pause between them) to swap a written watch file into place.
+REPLACE_RETRIES = 5
+REPLACE_RETRY_DELAY = 0.05
+
+# watch_id -> watch file, filled as watches are allocated or discovered on disk.
+_WATCH_INDEX: dict[str, Path] = {}
 
-def _as_json(model: Any) -> dict[str, Any]:
-    """Return a Pydantic model as a plain dict with JSON-serializable values."""
-    return json.loads(model.model_dump_json()) if hasattr(model, "model_dump_json") else model
+# Strong references to running fare watchers, and a cap on how many run at once.
+MAX_ACTIVE_WATCHES = 64
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
+_WATCH_SLOTS = asyncio.Semaphore(MAX_ACTIVE_WATCHES)
 
 
+@lru_cache(maxsize=1024)
 def _resource_uri(file_path: Path) -> str:
-    # Use file:// URIs per MCP resource-link recommendations.
-    # Use absolute path to ensure compatibility
-    absolute_path = file_path.resolve()
-    # Convert Windows paths to forward slashes
-    path_str = str(absolute_path).replace('\\', '/')
-    # Ensure proper file:// URI format
-    if not path_str.startswith('/'):
-        path_str = '/' + path_str
-    return f"file://{path_str}"
+    # Use file:// URIs per MCP resource-link recommendations; as_uri() handles
+    # Windows drive letters and percent-encodes non-ASCII characters.
+    return file_path.resolve().as_uri()
 
 
 def _slugify(*parts: str) -> str:
@@ -57,7 +80,8 @@ def _slugify(*parts: str) -> str:
     for part in parts:
         if not part:
             continue
-        token = re.sub(r"[^a-z0-9]+", "-", str(part).lower()).strip("-")
+        text = part if isinstance(part, str) else str(part)
+        token = _SLUG_RE.sub("-", text.lower()).strip("-")
         if token:
             tokens.append(token)
     return "-".join(tokens) or "watch"
@@ -75,31 +99,76 @@ def _allocate_watch_file(watch_id: str, origin: str, destination: str, departure
         path = STORE_DIR / file_name
         suffix += 1
     resource_name = f"flight-watch-{candidate}"
+    _WATCH_INDEX[watch_id] = path
     return path, file_name, resource_name
 
 
 def _locate_watch_file(watch_id: str) -> Path:
+    indexed_path = _WATCH_INDEX.get(watch_id)
+    if indexed_path is not None and indexed_path.exists():
+        return indexed_path
+
     legacy_path = STORE_DIR / f"{watch_id}.json"
     if legacy_path.exists():
+        _WATCH_INDEX[watch_id] = legacy_path
         return legacy_path
 
+    # Last resort: scan the store, indexing every watch seen along the way.
     for path in STORE_DIR.glob("*.json"):
         try:
-            payload = json.loads(path.read_text())
-        except json.JSONDecodeError:
+            payload = orjson.loads(path.read_bytes())
+        except orjson.JSONDecodeError:
             continue
-        if payload.get("watch_id") == watch_id:
+        found_id = payload.get("watch_id")
+        if found_id:
+            _WATCH_INDEX.setdefault(str(found_id), path)
+        if found_id == watch_id:
+            _WATCH_INDEX[watch_id] = path
             return path
 
     raise FileNotFoundError(f"Flight watch {watch_id} not found")
 
 
-def _write_watch_file(path: Path, payload: dict[str, Any]) -> None:
-    path.write_text(json.dumps(payload, indent=2))
+def _write_watch_file(path: Path, payload: dict[str, Any]) -> int:
+    """Write payload to path and return the file's resulting st_mtime_ns."""
+    # Readers run in worker threads too, so never expose a truncated file: write
+    # to a temp name the *.json scans skip, then swap it into place atomically.
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        # On Windows the replace fails while a reader thread holds the target open.
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp_path, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return path.stat().st_mtime_ns
+
+
+def _read_external_status(path: Path, last_write_ns: int) -> str | None:
+    """Return the watch file's status if something else changed it since last_write_ns.
+
+    A stat per tick is cheap; the file is only re-read when its mtime moved.
+    A deleted watch file counts as cancelled.
+    """
+    try:
+        if path.stat().st_mtime_ns == last_write_ns:
+            return None
+        return orjson.loads(path.read_bytes()).get("status")
+    except FileNotFoundError:
+        return "cancelled"
+    except orjson.JSONDecodeError:
+        return None
 
 
-def _parse_watch_id(uri: str | Any) -> str:
-    """Parse watch_id from a file:// URI."""
+def _path_from_uri(uri: str | Any) -> Path:
+    """Map a file:// resource URI onto its watch file in STORE_DIR."""
     # Convert to string in case it's a Pydantic AnyUrl object
     uri_str = str(uri)
     
@@ -109,53 +178,80 @@ def _parse_watch_id(uri: str | Any) -> str:
     if parsed.scheme and parsed.scheme != "file":
         raise ValueError(f"Unsupported resource scheme: {uri_str}")
 
-    # Extract the file path from the URI
-    # Handle both file:// and file:/// formats
-    file_path_str = urllib.parse.unquote(parsed.path)
-    
-    # Remove leading slash on Windows if present (e.g., /C:/path)
-    if len(file_path_str) > 2 and file_path_str[0] == '/' and file_path_str[2] == ':':
-        file_path_str = file_path_str[1:]
-    
-    # Try to find the file by name in STORE_DIR
-    file_name = Path(file_path_str).name
-    file_path = STORE_DIR / file_name
-    
-    if not file_path.exists():
-        raise FileNotFoundError(f"Durable resource path not found: {file_path}")
-
-    try:
-        payload = json.loads(file_path.read_text())
-    except json.JSONDecodeError as exc:  # pragma: no cover - defensive
-        raise ValueError(f"Invalid resource payload at {file_path}") from exc
-
-    watch_id = payload.get("watch_id")
-    if not watch_id:
-        # Fallback: try to extract from filename
-        watch_id = file_path.stem.split("-")[-1]
-    
-    if not watch_id:
+    # url2pathname is the inverse of Path.as_uri(), including Windows drive letters
+    file_name = Path(url2pathname(parsed.path)).name
+    if not file_name:
         raise ValueError(f"Unable to parse durable resource URI: {uri_str}")
+    return STORE_DIR / file_name
 
-    return str(watch_id)
 
+def _load_watch_by_path(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        raise FileNotFoundError(f"Durable resource path not found: {path}")
+
+    try:
+        payload = orjson.loads(path.read_bytes())
+    except orjson.JSONDecodeError as exc:  # pragma: no cover - defensive
+        raise ValueError(f"Invalid resource payload at {path}") from exc
 
-def _load_watch(watch_id: str) -> dict[str, Any]:
-    path = _locate_watch_file(watch_id)
-    payload = json.loads(path.read_text())
     payload.setdefault("file_name", path.name)
     payload.setdefault("resource_name", f"flight-watch-{path.stem}")
     return payload
 
 
-def _save_watch(watch_id: str, payload: dict[str, Any]) -> None:
-    file_name = payload.get("file_name")
-    if file_name:
-        path = STORE_DIR / file_name
-    else:
-        path = _locate_watch_file(watch_id)
-        payload["file_name"] = path.name
-    _write_watch_file(path, payload)
+def _load_watch(watch_id: str) -> dict[str, Any]:
+    return _load_watch_by_path(_locate_watch_file(watch_id))
+
+
+async def _notify_price_updates(
+    session,
+    *,
+    uri: str,
+    payload: dict[str, Any],
+    stages: list[dict[str, Any]],
+    previous_price: float,
+    target_price: float | None,
+    progress_token: Any | None = None,
+) -> None:
+    """Send one resource-updated and one progress notification for a batch of quotes."""
+    new_price = stages[-1]["price"]
+    try:
+        await session.send_resource_updated(uri=uri)
+        logger.debug("Sent resource update notification for %s", uri)
+
+        # Send progress notification to VS Code
+        if progress_token:
+            sequence = stages[-1]["sequence"]
+            status_emoji = "🚨" if payload["status"] == "notified" else "📊"
+
+            if payload["status"] == "notified":
+                message = (
+                    f"{status_emoji} PRICE ALERT!\n"
+                    f"Flight: {payload['origin']} → {payload['destination']}\n"
+                    f"Price dropped to ${new_price} (target: ${target_price})\n"
+                    f"Book now!"
+                )
+            else:
+                price_change = new_price - previous_price
+                change_indicator = "📈" if price_change > 0 else "📉"
+                quotes = " → ".join(f"${stage['price']}" for stage in stages)
+                message = (
+                    f"{status_emoji} Price Update #{sequence}\n"
+                    f"Flight: {payload['origin']} → {payload['destination']}\n"
+                    f"Current price: ${new_price} {change_indicator}\n"
+                    f"Quotes since last update: {quotes}\n"
+                    f"Target: ${target_price if target_price else 'Not set'}"
+                )
+
+            await session.send_progress_notification(
+                progress_token=progress_token,
+                progress=sequence,
+                total=sequence + 1,  # We don't know total updates in advance
+                message=message,
+            )
+            logger.debug("Sent progress notification for price update")
+    except Exception as e:
+        logger.warning("Failed to send notification: %s", e)
 
 
 async def _simulate_price_updates(
@@ -167,24 +263,48 @@ async def _simulate_price_updates(
     jitter_seed: int,
     progress_token: Any | None = None,
 ) -> None:
-    """Simulate a fare watcher that emits resource updates when prices change."""
+    """Simulate a fare watcher that emits resource updates when prices change.
+
+    Quotes are persisted on every tick, but notifications are batched: they are
+    flushed once NOTIFY_BATCH_SIZE quotes have accumulated, NOTIFY_MAX_DELAY
+    seconds have passed since the last flush, or the watch reaches its target.
+    """
     rng = random.Random(jitter_seed)
+    pending: list[dict[str, Any]] = []
+    previous_price: float | None = None
+    last_flush = time.monotonic()
+
+    # Keep the payload in memory; the file is only re-read when an external edit
+    # (such as setting its status to "cancelled") has changed it since our last write.
+    file_path = await asyncio.to_thread(_locate_watch_file, watch_id)
+    last_write_ns = (await asyncio.to_thread(file_path.stat)).st_mtime_ns
+    payload = await asyncio.to_thread(_load_watch, watch_id)
+    if payload.get("status") in {"notified", "cancelled"}:
+        return
+
     while True:
-        await anyio.sleep(rng.uniform(1.0, 2.0))
-        payload = _load_watch(watch_id)
-        if payload.get("status") in {"notified", "cancelled"}:
+        await asyncio.sleep(rng.uniform(1.0, 2.0))
+
+        external_status = await asyncio.to_thread(_read_external_status, file_path, last_write_ns)
+        if external_status in {"notified", "cancelled"}:
+            logger.info("Watch %s was %s externally; stopping", watch_id, external_status)
             break
 
-        current_price = payload["history"][-1]["price"]
+        history = payload["history"]
+        current_price = history[-1]["price"]
+        if previous_price is None:
+            previous_price = current_price
         delta = rng.randint(-40, 20)
         new_price = max(current_price + delta, 50)
         stage = {
-            "sequence": len(payload["history"]),
+            "sequence": history[-1].get("sequence", len(history) - 1) + 1,
             "status": "price_update",
             "price": new_price,
             "note": "Received new quote from fare service.",
         }
-        payload["history"].append(stage)
+        history.append(stage)
+        del history[:-HISTORY_WINDOW]
+        pending.append(stage)
 
         if target_price is not None and new_price <= target_price:
             payload["status"] = "notified"
@@ -192,95 +312,92 @@ async def _simulate_price_updates(
                 f"🎉 PRICE ALERT! Flight {payload['origin']} → {payload['destination']} "
                 f"dropped to ${new_price} (target was ${target_price})"
             )
-            print(f"⚠️  PRICE ALERT: {payload['summary']}", flush=True)
+            logger.info("PRICE ALERT: %s", payload["summary"])
         else:
             payload["status"] = "watching"
-            print(f"📊 Price update: {payload['origin']} → {payload['destination']} "
-                  f"now ${new_price} (was ${current_price})", flush=True)
+            logger.info(
+                "Price update: %s → %s now $%s (was $%s)",
+                payload["origin"], payload["destination"], new_price, current_price,
+            )
 
-        _save_watch(watch_id, payload)
-        
         try:
-            await session.send_resource_updated(uri=uri)
-            print(f"✅ Sent resource update notification for {uri}", flush=True)
-            
-            # Send progress notification to VS Code
-            if progress_token:
-                history_len = len(payload["history"])
-                status_emoji = "🚨" if payload["status"] == "notified" else "📊"
-                
-                if payload["status"] == "notified":
-                    message = (
-                        f"{status_emoji} PRICE ALERT!\n"
-                        f"Flight: {payload['origin']} → {payload['destination']}\n"
-                        f"Price dropped to ${new_price} (target: ${target_price})\n"
-                        f"Book now!"
-                    )
-                else:
-                    price_change = new_price - current_price
-                    change_indicator = "📈" if price_change > 0 else "📉"
-                    message = (
-                        f"{status_emoji} Price Update #{history_len}\n"
-                        f"Flight: {payload['origin']} → {payload['destination']}\n"
-                        f"Current price: ${new_price} {change_indicator}\n"
-                        f"Target: ${target_price if target_price else 'Not set'}"
-                    )
-                
-                await session.send_progress_notification(
-                    progress_token=progress_token,
-                    progress=history_len,
-                    total=history_len + 1,  # We don't know total updates in advance
-                    message=message,
-                )
-                print("✅ Sent progress notification for price update", flush=True)
-        except Exception as e:
-            print(f"❌ Failed to send notification: {e}", flush=True)
+            last_write_ns = await asyncio.to_thread(_write_watch_file, file_path, payload)
+        except PermissionError as exc:
+            # Keep watching; the next tick rewrites the file with this quote included.
+            logger.warning("Could not update watch file %s: %s", file_path, exc)
+
+        if (
+            payload["status"] == "notified"
+            or len(pending) >= NOTIFY_BATCH_SIZE
+            or time.monotonic() - last_flush >= NOTIFY_MAX_DELAY
+        ):
+            await _notify_price_updates(
+                session,
+                uri=uri,
+                payload=payload,
+                stages=pending,
+                previous_price=previous_price,
+                target_price=target_price,
+                progress_token=progress_token,
+            )
+            previous_price = None
+            pending = []
+            last_flush = time.monotonic()
 
         if payload["status"] == "notified":
             break
 
 
-@server.list_tools()
-async def handle_list_tools() -> list[Tool]:
-    return [
-        Tool(
-            name="track_flight_price",
-            description=(
-                "Persist an itinerary snapshot and obtain a durable resource link "
-                "that streams fare updates for out-of-band monitoring."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "origin": {
-                        "type": "string",
-                        "description": "IATA code or city for departure (e.g., LHR).",
-                    },
-                    "destination": {
-                        "type": "string",
-                        "description": "IATA code or city for arrival (e.g., LIS).",
-                    },
-                    "departure_date": {
-                        "type": "string",
-                        "description": "ISO date string for the desired travel date.",
-                    },
-                    "initial_price": {
-                        "type": "number",
-                        "description": "The latest fare quote captured by the agent.",
-                    },
-                    "target_price": {
-                        "type": "number",
-                        "description": "Optional alert threshold for the traveler.",
-                    },
-                    "context_file": {
-                        "type": "string",
-                        "description": "Optional DeepAgents virtual file name for provenance.",
-                    },
+async def _run_watch(watch_id: str, **kwargs: Any) -> None:
+    """Run a fare watcher once one of the MAX_ACTIVE_WATCHES slots is free."""
+    async with _WATCH_SLOTS:
+        await _simulate_price_updates(watch_id, **kwargs)
+
+
+_TOOLS: list[Tool] = [
+    Tool(
+        name="track_flight_price",
+        description=(
+            "Persist an itinerary snapshot and obtain a durable resource link "
+            "that streams fare updates for out-of-band monitoring."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "origin": {
+                    "type": "string",
+                    "description": "IATA code or city for departure (e.g., LHR).",
+                },
+                "destination": {
+                    "type": "string",
+                    "description": "IATA code or city for arrival (e.g., LIS).",
+                },
+                "departure_date": {
+                    "type": "string",
+                    "description": "ISO date string for the desired travel date.",
+                },
+                "initial_price": {
+                    "type": "number",
+                    "description": "The latest fare quote captured by the agent.",
+                },
+                "target_price": {
+                    "type": "number",
+                    "description": "Optional alert threshold for the traveler.",
+                },
+                "context_file": {
+                    "type": "string",
+                    "description": "Optional DeepAgents virtual file name for provenance.",
                 },
-                "required": ["origin", "destination", "departure_date", "initial_price"],
             },
-        )
-    ]
+            "required": ["origin", "destination", "departure_date", "initial_price"],
+        },
+    )
+]
+
+
+@server.list_tools()
+async def handle_list_tools() -> list[Tool]:
+    return _TOOLS
 
 
 @server.call_tool()
@@ -308,6 +425,15 @@ async def handle_call_tool(name: str, arguments: dict[str, Any] | None):
     destination_str = str(destination)
     departure_date_str = str(departure_date)
 
+    # Watches without a target price run until cancelled, so a queued watch could
+    # wait for a slot forever; refuse new ones while every slot is taken.
+    if _WATCH_SLOTS.locked() or len(_BACKGROUND_TASKS) >= MAX_ACTIVE_WATCHES:
+        logger.warning("Refusing fare watch: %d watches already active", MAX_ACTIVE_WATCHES)
+        raise ValueError(
+            f"Too many active fare watches (limit {MAX_ACTIVE_WATCHES}); "
+            "cancel an existing watch and try again"
+        )
+
     watch_id = uuid.uuid4().hex
 
     payload = {
@@ -332,7 +458,7 @@ async def handle_call_tool(name: str, arguments: dict[str, Any] | None):
     )
     payload["file_name"] = file_name
     payload["resource_name"] = resource_name
-    _write_watch_file(file_path, payload)
+    await asyncio.to_thread(_write_watch_file, file_path, payload)
 
     uri = _resource_uri(file_path)
 
@@ -343,8 +469,8 @@ async def handle_call_tool(name: str, arguments: dict[str, Any] | None):
 
     session = ctx.session if ctx else None
     if session is not None:
-        asyncio.create_task(
-            _simulate_price_updates(
+        task = asyncio.create_task(
+            _run_watch(
                 watch_id,
                 session=session,
                 uri=uri,
@@ -353,6 +479,8 @@ async def handle_call_tool(name: str, arguments: dict[str, Any] | None):
                 progress_token=progress_token,
             )
         )
+        _BACKGROUND_TASKS.add(task)
+        task.add_done_callback(_BACKGROUND_TASKS.discard)
 
     link_meta = {
         "origin": origin_str,
@@ -365,72 +493,69 @@ async def handle_call_tool(name: str, arguments: dict[str, Any] | None):
     }
 
     return [
-        _as_json(
-            TextContent(
-                type="text",
-                text=(
-                    f"✅ Fare watch registered for {origin_str} → {destination_str} on {departure_date_str}.\n\n"
-                    f"Initial price: ${initial_price}\n"
-                    f"Target alert price: ${target_price if target_price else 'Not set'}\n\n"
-                    "I'll monitor this flight and notify you when the price changes. "
-                    "The tracking data is saved in a persistent resource that you can check anytime. "
-                    "To ensure you receive notifications, please subscribe to this resource in VS Code."
-                ),
-            )
+        TextContent(
+            type="text",
+            text=(
+                f"✅ Fare watch registered for {origin_str} → {destination_str} on {departure_date_str}.\n\n"
+                f"Initial price: ${initial_price}\n"
+                f"Target alert price: ${target_price if target_price else 'Not set'}\n\n"
+                "I'll monitor this flight and notify you when the price changes. "
+                "The tracking data is saved in a persistent resource that you can check anytime. "
+                "To ensure you receive notifications, please subscribe to this resource in VS Code."
+            ),
         ),
-        _as_json(
-            ResourceLink(
-                type="resource_link",
-                name=resource_name,
-                uri=uri,
-                description=f"Flight watch: {origin_str} → {destination_str} ({departure_date_str})",
-                mimeType="application/json",
-                meta=link_meta,
-            )
+        ResourceLink(
+            type="resource_link",
+            name=resource_name,
+            uri=uri,
+            description=f"Flight watch: {origin_str} → {destination_str} ({departure_date_str})",
+            mimeType="application/json",
+            meta=link_meta,
         ),
     ]
 
 
+def _read_resource_header(path: Path) -> tuple[Path, str, str, str] | None:
+    """Read just the fields of a watch file needed to describe it as a Resource."""
+    try:
+        payload = orjson.loads(path.read_bytes())
+    except orjson.JSONDecodeError:
+        return None
+
+    file_name = payload.get("file_name") or path.name
+    resource_name = payload.get("resource_name") or f"flight-watch-{Path(file_name).stem}"
+    return path, resource_name, payload.get("origin", "?"), payload.get("destination", "?")
+
+
 @server.list_resources()
 async def handle_list_resources() -> list[Resource]:
-    resources: list[Resource] = []
-    for path in sorted(STORE_DIR.glob("*.json")):
-        try:
-            payload = json.loads(path.read_text())
-        except json.JSONDecodeError:
-            continue
-            
-        watch_id = str(payload.get("watch_id") or path.stem)
-        file_name = payload.get("file_name") or path.name
-        resource_name = payload.get("resource_name") or f"flight-watch-{Path(file_name).stem}"
-        description = "Flight watch: {origin} → {destination}".format(
-            origin=payload.get("origin", "?"),
-            destination=payload.get("destination", "?"),
-        )
-        resources.append(
-            Resource(
-                name=resource_name,
-                uri=_resource_uri(path),
-                description=description,
-                mimeType="application/json",
-            )
+    paths = sorted(STORE_DIR.glob("*.json"))
+    headers = await asyncio.gather(
+        *(asyncio.to_thread(_read_resource_header, path) for path in paths)
+    )
+    return [
+        Resource(
+            name=resource_name,
+            uri=_resource_uri(path),
+            description=f"Flight watch: {origin} → {destination}",
+            mimeType="application/json",
         )
-    return resources
+        for path, resource_name, origin, destination in filter(None, headers)
+    ]
 
 
 @server.read_resource()
 async def handle_read_resource(uri: str) -> str:
-    watch_id = _parse_watch_id(uri)
-    payload = _load_watch(watch_id)
-    return json.dumps(payload, indent=2)
+    payload = await asyncio.to_thread(_load_watch_by_path, _path_from_uri(uri))
+    return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
 
 
 @server.subscribe_resource()
 async def handle_subscribe_resource(uri: str) -> None:
     """Handle resource subscription requests from VS Code."""
     # Validate that the resource exists
-    watch_id = _parse_watch_id(uri)
-    _load_watch(watch_id)  # This will raise if watch doesn't exist
+    # This will raise if the watch doesn't exist
+    await asyncio.to_thread(_load_watch_by_path, _path_from_uri(uri))
     # VS Code is now subscribed and will receive send_resource_updated notifications
 
 
@@ -443,5 +568,8 @@ async def main() -> None:
         )
 
 
-if __name__ == "__main__": 
-    asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -5,12 +5,16 @@ This server provides research, and long-running task capabilities
 via stdio communication for VS Code MCP integration.
 """
 import asyncio
-import json
 import logging
 import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from typing import Any, Literal
 from uuid import uuid4
 
+import orjson
 from dotenv import load_dotenv
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.types import Command
@@ -25,8 +29,10 @@ from tavily import TavilyClient
 
 load_dotenv()
 
-os.environ["AZURE_INFERENCE_ENDPOINT"] = os.getenv("AZURE_ENDPOINT")
-os.environ["AZURE_INFERENCE_CREDENTIAL"] = os.getenv("AZURE_CREDENTIAL")
+_AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT")
+_AZURE_CRED = os.getenv("AZURE_CREDENTIAL")
+os.environ["AZURE_INFERENCE_ENDPOINT"] = _AZURE_ENDPOINT
+os.environ["AZURE_INFERENCE_CREDENTIAL"] = _AZURE_CRED
 tavily_api_key = os.getenv("TAVILY_API_KEY")
 
 # Configure logging
@@ -59,6 +65,214 @@ class ToolApprovalSchema(BaseModel):
     )
 
 
+_APPROVAL_SCHEMA = ToolApprovalSchema.model_json_schema()
+
+
+class LatestCheckpointSaver(InMemorySaver):
+    """In-memory checkpointer that keeps only the newest checkpoint per thread.
+
+    The research run only needs to resume from its latest checkpoint after a
+    human-in-the-loop interrupt, so superseded checkpoints, their pending writes
+    and channel blobs no longer referenced are dropped on every put. This rules
+    out time travel and delta channels, neither of which this agent uses.
+    """
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = next_config["configurable"]["thread_id"]
+        checkpoint_ns = next_config["configurable"]["checkpoint_ns"]
+        latest_id = next_config["configurable"]["checkpoint_id"]
+
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [cid for cid in checkpoints if cid != latest_id]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        live_blobs = {
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in checkpoint["channel_versions"].items()
+        }
+        for key in [
+            key for key in self.blobs
+            if key[:2] == (thread_id, checkpoint_ns) and key not in live_blobs
+        ]:
+            del self.blobs[key]
+        return next_config
+
+
+# The search client, model and compiled agent graph are built once and shared
+# across tool calls; each call runs on its own checkpointer thread_id.
+_TAVILY: TavilyClient | None = None
+_MODEL: AzureAIChatCompletionsModel | None = None
+_AGENT: Any | None = None
+_AGENT_LOCK = asyncio.Lock()
+
+# Recent Tavily results keyed by search arguments, shared across tool calls.
+SEARCH_CACHE_SIZE = 16
+_SEARCH_CACHE: OrderedDict[tuple[str, int, str, bool], dict[str, Any]] = OrderedDict()
+# internet_search runs in LangGraph's executor threads, so cache access is serialized.
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+def internet_search(
+    query: str,
+    max_results: int = 5,
+    topic: Literal["general", "news", "finance"] = "general",
+    include_raw_content: bool = False,
+) -> dict[str, Any]:
+    """Run a web search, reusing cached results for repeated queries."""
+    key = (query, max_results, topic, include_raw_content)
+    with _SEARCH_CACHE_LOCK:
+        cached = _SEARCH_CACHE.get(key)
+        if cached is not None:
+            _SEARCH_CACHE.move_to_end(key)
+    if cached is not None:
+        logger.info("Returning cached internet_search results for %r", query)
+        return cached
+
+    payload = _TAVILY.search(
+        query,
+        max_results=max_results,
+        include_raw_content=include_raw_content,
+        topic=topic,
+    )
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = payload
+        if len(_SEARCH_CACHE) > SEARCH_CACHE_SIZE:
+            _SEARCH_CACHE.popitem(last=False)
+    return payload
+
+
+# Prompt prefix to steer the agent to be an expert researcher
+RESEARCH_INSTRUCTIONS = """You are an expert researcher. 
+    Your job is to conduct thorough research, and then write a polished report.
+    YOU ALWAYS USE A TODO LIST TO TRACK YOUR PROGRESS.
+
+    You have access to a few tools.
+
+    ## `internet_search`
+
+    Use this to run an internet search for a given query. You can specify the number 
+    of results, the topic, and whether raw content should be included.
+    You must call `internet_search` exactly once per research request. Plan carefully before invoking it.
+    
+    IMPORTANT: Use the todo list tool to track your progress.
+    """
+
+INTERRUPT_CONFIG = {
+    "internet_search": {
+        "allow_accept": True,
+        "allow_edit": True,
+        "allow_respond": True,
+        "allow_ignore": False,
+    }
+}
+
+
+async def _get_agent() -> Any:
+    """Build the research agent on first use and return the shared instance."""
+    global _TAVILY, _MODEL, _AGENT
+    if _AGENT is not None:
+        return _AGENT
+
+    async with _AGENT_LOCK:
+        if _AGENT is not None:
+            return _AGENT
+
+        _TAVILY = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
+
+        # Create agent with human-in-the-loop interrupts enabled
+        _MODEL = AzureAIChatCompletionsModel(
+            credential=_AZURE_CRED,
+            endpoint=_AZURE_ENDPOINT,
+            model="gpt-5-mini",
+        )
+
+        _AGENT = create_deep_agent(
+            [internet_search],
+            RESEARCH_INSTRUCTIONS,
+            model=_MODEL,
+            interrupt_config=INTERRUPT_CONFIG,
+            checkpointer=LatestCheckpointSaver(),
+        )
+    return _AGENT
+
+
+# One LangGraph thread per MCP client session, so follow-up topics from the same
+# client continue from its last checkpoint instead of starting cold.
+_SESSION_THREADS: weakref.WeakKeyDictionary[Any, str] = weakref.WeakKeyDictionary()
+
+# Threads with a run in flight. LatestCheckpointSaver keeps only the newest
+# checkpoint, so two runs must never share a thread at the same time.
+_BUSY_THREADS: set[str] = set()
+
+
+def _acquire_thread_id(ctx: Any | None) -> str:
+    """Claim a checkpointer thread_id for the client session behind ctx.
+
+    Falls back to a fresh thread while the session's own thread is busy with
+    a parallel tool call. Release the id with _release_thread_id when done.
+    """
+    session = getattr(ctx, "session", None)
+    thread_id = _SESSION_THREADS.get(session) if session is not None else None
+    if thread_id is None:
+        thread_id = str(uuid4())
+        if session is not None:
+            _SESSION_THREADS[session] = thread_id
+    elif thread_id in _BUSY_THREADS:
+        thread_id = str(uuid4())
+    _BUSY_THREADS.add(thread_id)
+    return thread_id
+
+
+def _release_thread_id(thread_id: str) -> None:
+    """Mark thread_id as free for the next call from its session."""
+    _BUSY_THREADS.discard(thread_id)
+
+
+# Todo updates arriving closer together than this are coalesced into one notification.
+PROGRESS_DEBOUNCE_SECONDS = 0.15
+
+_STATUS_EMOJI = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}
+
+
+def parse_message_text(content: Any) -> str:
+    """Flatten LangChain content payloads into plain text."""
+    if type(content) is str:
+        return content
+    if type(content) is list:
+        return "\n".join(
+            str(item["text"]) if type(item) is dict and "text" in item else str(item)
+            for item in content
+        )
+    return str(content)
+
+
+def _format_todo_line(idx: int, todo: dict[str, Any]) -> str:
+    """Render one todo as a numbered progress line with a status badge."""
+    status = (todo.get("status") or "pending").strip()
+    content = parse_message_text(todo.get("content", "")).strip()
+    return f"{idx:>2}. {_STATUS_EMOJI.get(status, '•')} {content} [{status.replace('_', ' ')}]"
+
+
+_TOOLS: list[Tool] = [
+    Tool(
+        name="research_agent_tool",
+        description="Research a topic with progress updates",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "topic": {
+                    "type": "string",
+                    "description": "Research topic",
+                    "default": "AI trends"
+                }
+            }
+        },
+    )
+]
+
+
 @server.list_tools()
 async def handle_list_tools() -> list[Tool]:
     """List all available tools in the server.
@@ -66,22 +280,7 @@ async def handle_list_tools() -> list[Tool]:
     Returns:
         List of Tool objects with their definitions
     """
-    return [
-        Tool(
-            name="research_agent_tool",
-            description="Research a topic with progress updates",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "topic": {
-                        "type": "string",
-                        "description": "Research topic",
-                        "default": "AI trends"
-                    }
-                }
-            },
-        )
-    ]
+    return _TOOLS
 
 
 async def research_agent_tool(
@@ -99,98 +298,48 @@ async def research_agent_tool(
     Returns:
         List of TextContent with research results
     """
-    tavily_client = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
-
-    # Search tool to use to do research
-    search_invocations = 0
-    last_search_payload: dict[str, Any] | None = None
-
-    def internet_search(
-        query: str,
-        max_results: int = 5,
-        topic: Literal["general", "news", "finance"] = "general",
-        include_raw_content: bool = False,
-    ) -> dict[str, Any]:
-        """Run a web search and cache the first result set."""
-        nonlocal search_invocations, last_search_payload
-        if search_invocations >= 1:
-            logger.info("Preventing additional internet_search call; returning cached results")
-            assert last_search_payload is not None
-            return last_search_payload
-
-        search_invocations += 1
-        last_search_payload = tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic,
-        )
-        return last_search_payload
-
-    # Prompt prefix to steer the agent to be an expert researcher
-    research_instructions = """You are an expert researcher. 
-    Your job is to conduct thorough research, and then write a polished report.
-    YOU ALWAYS USE A TODO LIST TO TRACK YOUR PROGRESS.
-
-    You have access to a few tools.
-
-    ## `internet_search`
-
-    Use this to run an internet search for a given query. You can specify the number 
-    of results, the topic, and whether raw content should be included.
-    You must call `internet_search` exactly once per session. Plan carefully before invoking it.
-    
-    IMPORTANT: Use the todo list tool to track your progress.
-    """
+    agent = await _get_agent()
 
-    os.environ["AZURE_INFERENCE_ENDPOINT"] = os.getenv("AZURE_ENDPOINT")
-    os.environ["AZURE_INFERENCE_CREDENTIAL"] = os.getenv("AZURE_CREDENTIAL")
+    # Track todo progress so we only emit real updates
+    last_reported_todos: tuple[tuple[str, str], ...] | None = None
 
-    interrupt_config = {
-        "internet_search": {
-            "allow_accept": True,
-            "allow_edit": True,
-            "allow_respond": True,
-            "allow_ignore": False,
-        }
-    }
+    # Debounce state: bursts of todo updates collapse into the latest one.
+    pending_progress: tuple[int, int, str] | None = None
+    last_progress_sent = 0.0
+    flush_task: asyncio.Task | None = None
 
-    # Create agent with human-in-the-loop interrupts enabled
-    model = AzureAIChatCompletionsModel(
-        credential=os.getenv("AZURE_CREDENTIAL"),
-        endpoint=os.getenv("AZURE_ENDPOINT"),
-        model="gpt-5-mini",
-    )
-
-    checkpointer = InMemorySaver()
-    agent = create_deep_agent(
-        [internet_search],
-        research_instructions,
-        model=model,
-        interrupt_config=interrupt_config,
-        checkpointer=checkpointer,
-    )
+    async def flush_progress() -> None:
+        nonlocal pending_progress, last_progress_sent
+        if pending_progress is None:
+            return
+        completed, total, message_body = pending_progress
+        pending_progress = None
+        last_progress_sent = time.monotonic()
+        await ctx.session.send_progress_notification(
+            progress_token=progress_token,
+            progress=completed,
+            total=total,
+            message=message_body,
+        )
 
-    # Track todo progress so we only emit real updates
-    last_reported_todos: tuple[tuple[str, str], ...] | None = None
+    async def flush_progress_later(delay: float) -> None:
+        nonlocal flush_task
+        await asyncio.sleep(delay)
+        flush_task = None
+        await flush_progress()
 
-    def parse_message_text(content: Any) -> str:
-        """Flatten LangChain content payloads into plain text."""
-        if isinstance(content, str):
-            return content
-        if isinstance(content, list):
-            texts: list[str] = []
-            for item in content:
-                if isinstance(item, dict) and "text" in item:
-                    texts.append(str(item["text"]))
-                else:
-                    texts.append(str(item))
-            return "\n".join(texts)
-        return str(content)
+    async def drain_progress() -> None:
+        """Send any debounced update now, e.g. before blocking on the user."""
+        nonlocal flush_task
+        if flush_task is not None:
+            flush_task.cancel()
+            flush_task = None
+        await flush_progress()
 
     async def emit_progress(todos: list[dict[str, Any]]) -> None:
-        nonlocal last_reported_todos
-        if not todos:
+        nonlocal last_reported_todos, pending_progress, flush_task
+        # Nothing to do when the client did not ask for progress notifications.
+        if not todos or ctx is None or progress_token is None:
             return
         todo_signature = tuple(
             (todo.get("content", ""), todo.get("status", "")) for todo in todos
@@ -199,34 +348,27 @@ async def research_agent_tool(
             return
         last_reported_todos = todo_signature
 
-        if ctx is None or progress_token is None:
-            return
-
-        total = len(todos) or 1
+        total = len(todos)
         completed = sum(1 for _, status in todo_signature if status == "completed")
-        status_emoji = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}
 
         # Format a compact, multi-line summary so the client renders the progress cleanly.
         header_line = f"Progress: {completed}/{total} tasks complete"
-        separator_line = "-" * len(header_line)
-        todo_lines = []
-        for idx, todo in enumerate(todos, 1):
-            status = (todo.get("status") or "pending").strip()
-            content = parse_message_text(todo.get("content", "")).strip()
-            badge = status_emoji.get(status, "•")
-            readable_status = status.replace("_", " ")
-            todo_lines.append(f"{idx:>2}. {badge} {content} [{readable_status}]")
-
-        message_body = "\n".join([header_line, separator_line, *todo_lines]) if todo_lines else header_line
-
-        await ctx.session.send_progress_notification(
-            progress_token=progress_token,
-            progress=completed,
-            total=total,
-            message=message_body,
-        )
+        message_body = "\n".join([
+            header_line,
+            "-" * len(header_line),
+            *[_format_todo_line(idx, todo) for idx, todo in enumerate(todos, 1)],
+        ])
+
+        pending_progress = (completed, total, message_body)
+        elapsed = time.monotonic() - last_progress_sent
+        if elapsed >= PROGRESS_DEBOUNCE_SECONDS:
+            await flush_progress()
+        elif flush_task is None:
+            flush_task = asyncio.create_task(
+                flush_progress_later(PROGRESS_DEBOUNCE_SECONDS - elapsed)
+            )
 
-    final_response_text = ""
+    last_ai_message: Any | None = None
 
     async def handle_interrupts(interrupts: tuple[Any, ...]) -> list[dict[str, Any]]:
         """Resolve LangGraph interrupts by eliciting user input when available."""
@@ -248,13 +390,13 @@ async def research_agent_tool(
             logger.info("No request context available; auto-approving tool '%s'", tool_name)
             return [{"type": "accept", "args": None}]
 
-        message_lines = [description.strip(), "", f"Tool: {tool_name}", "Arguments:", json.dumps(tool_args, indent=2)]
-        message = "\n".join(line for line in message_lines if line)
+        message_lines = [description.strip(), "", f"Tool: {tool_name}", "Arguments:", orjson.dumps(tool_args, option=orjson.OPT_INDENT_2).decode()]
+        message = "\n".join(message_lines)
 
         try:
             elicitation_result = await ctx.session.elicit(
                 message=message,
-                requestedSchema=ToolApprovalSchema.model_json_schema(),
+                requestedSchema=_APPROVAL_SCHEMA,
                 related_request_id=getattr(ctx, "request_id", None),
             )
         except Exception as exc:  # noqa: BLE001 - errors expected when client lacks support
@@ -298,45 +440,59 @@ async def research_agent_tool(
         logger.info("User declined tool '%s' with message: %s", tool_name, decline_message)
         return [{"type": "response", "args": decline_message}]
 
-    thread_config = {"configurable": {"thread_id": str(uuid4())}}
-    pending_payload: Command | dict[str, Any] | None = {
-        "messages": [{"role": "user", "content": topic}]
-    }
+    thread_id = _acquire_thread_id(ctx)
+    thread_config = {"configurable": {"thread_id": thread_id}}
 
-    while pending_payload is not None:
-        current_payload = pending_payload
-        pending_payload = None
-        for chunk in agent.stream(current_payload, config=thread_config, stream_mode="values"):
-            if isinstance(chunk, dict):
-                todos_from_state = chunk.get("state", {}).get("todos")
-                if todos_from_state:
-                    await emit_progress(todos_from_state)
+    async def stream_until_complete(payload: Command | dict[str, Any] | None):
+        """Yield state chunks, resuming the graph after each human-in-the-loop interrupt."""
+        while payload is not None:
+            current_payload, payload = payload, None
+            async for chunk in agent.astream(current_payload, config=thread_config, stream_mode="values"):
+                if not isinstance(chunk, dict):
+                    continue
+                yield chunk
 
                 interrupts = chunk.get("__interrupt__")
                 if interrupts:
-                    responses = await handle_interrupts(interrupts)
-                    pending_payload = Command(resume=responses)
+                    await drain_progress()
+                    payload = Command(resume=await handle_interrupts(interrupts))
                     break
 
-                if "messages" not in chunk:
-                    continue
-
-                for message in chunk["messages"]:
-                    if hasattr(message, "tool_calls") and message.tool_calls:
-                        for tool_call in message.tool_calls:
-                            if tool_call.get("name") == "write_todos":
-                                todos = tool_call.get("args", {}).get("todos")
-                                if isinstance(todos, list):
-                                    await emit_progress(todos)
-
-                    if getattr(message, "type", None) == "ai":
-                        final_response_text = parse_message_text(getattr(message, "content", ""))
-            else:
-                continue
-
-        if pending_payload is None:
-            break
-
+    try:
+        # The session thread still holds the previous topic's todo list; clear it
+        # so progress only ever reflects this topic.
+        async for chunk in stream_until_complete(
+            {"messages": [{"role": "user", "content": topic}], "todos": []}
+        ):
+            # With stream_mode="values" each chunk is the full agent state, whose
+            # "todos" key is updated once write_todos has run.
+            todos_from_state = chunk.get("todos")
+            if todos_from_state:
+                await emit_progress(todos_from_state)
+
+            # Each chunk carries the whole history; only the newest AI message after
+            # this topic's prompt matters, and its text is flattened once the stream
+            # has finished.
+            for message in reversed(chunk.get("messages", ())):
+                message_type = getattr(message, "type", None)
+                if message_type == "ai":
+                    last_ai_message = message
+                    break
+                if message_type == "human":
+                    break
+    finally:
+        _release_thread_id(thread_id)
+        # Don't let a delayed flush report progress after a failed or cancelled run.
+        if flush_task is not None:
+            flush_task.cancel()
+            flush_task = None
+
+    await drain_progress()
+    final_response_text = (
+        parse_message_text(getattr(last_ai_message, "content", ""))
+        if last_ai_message is not None
+        else ""
+    )
     return [TextContent(type="text", text=final_response_text)]
 
 
@@ -354,7 +510,7 @@ async def handle_call_tool(name: str, arguments: Any):
     Raises:
         ValueError: If tool name is not recognized
     """
-    logger.info(f"Tool called: {name} with args: {arguments}")
+    logger.info("Tool called: %s with args: %s", name, arguments)
     
     # Get the request context for progress notifications
     ctx = server.request_context
@@ -364,7 +520,7 @@ async def handle_call_tool(name: str, arguments: Any):
     if ctx.meta:
         progress_token = ctx.meta.progressToken
     
-    logger.info(f"Progress token from request: {progress_token}")
+    logger.info("Progress token from request: %s", progress_token)
     
     # Ensure arguments is dict-like to avoid attribute errors
     if arguments is None: